@@ -2,230 +2,536 @@
 """
 Backend API Testing for Auto Concierge Jamaica
 Tests all required endpoints with proper authentication and rate limiting
+
+A valid admin token from a previous run against the same base URL is
+reused instead of logging in; set AUTOCONCIERGE_FORCE_LOGIN=1 to always
+exercise POST /api/admin/login.
 """
 
 import requests
+import functools
+import hashlib
 import json
+import os
 import sys
+import tempfile
+import threading
 import time
-from datetime import datetime
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from datetime import datetime, timezone
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # optional speedup, fall back to stdlib json
+    orjson = None
+
+
+# Result line prefixes, encoded once for log_result's direct byte writes
+_PASS = "✅ ".encode()
+_FAIL = "❌ ".encode()
+
+
+def parse_json(response):
+    """Decode a JSON response body, using orjson when available"""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+def write_json(obj, path):
+    """Write obj to path as indented JSON, using orjson when available"""
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, "w") as f:
+            json.dump(obj, f, indent=2)
+
+# Per-user directory for state kept between runs (token bucket, admin token)
+_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+    "autoconcierge"
+)
+
+
+def _host_key(base_url):
+    """Short stable key for per-host state files"""
+    return hashlib.sha256(base_url.encode()).hexdigest()[:16]
+
+
+def _read_private_json(path):
+    """Load JSON from a file we own with no group/other access; None otherwise"""
+    try:
+        fd = os.open(path, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
+        with os.fdopen(fd) as f:
+            st = os.fstat(f.fileno())
+            if hasattr(os, "getuid") and (st.st_uid != os.getuid() or st.st_mode & 0o077):
+                return None
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_private_json(obj, path):
+    """Atomically replace path with obj as JSON in a fresh 0600 file; errors are ignored"""
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        # mkstemp creates a fresh 0600 file (O_EXCL), never an existing one
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp.")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(obj, f)
+        # rename replaces the path itself, even if it is a planted symlink
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+def _safe_test(name):
+    """Log any exception escaping a test method as a failed `name` result"""
+    def decorator(test):
+        @functools.wraps(test)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return test(self, *args, **kwargs)
+            except Exception as e:
+                self.log_result(name, False, f"Exception: {e!s}")
+                return False
+        return wrapper
+    return decorator
+
+class _TokenBucket:
+    """Client-side pacer: allow `capacity` calls in a burst, refilling at `refill_per_sec`
+
+    With a `state_path` the bucket level is saved after every acquire and
+    reloaded before the next one, so it also paces successive runs.
+    """
+
+    __slots__ = ("capacity", "tokens", "rate", "ts", "lock", "state_path")
+
+    def __init__(self, capacity, refill_per_sec, state_path=None):
+        self.capacity = capacity
+        self.tokens = capacity
+        self.rate = refill_per_sec
+        # Wall-clock time so the level carries over between processes
+        self.ts = time.time()
+        self.lock = threading.Lock()
+        self.state_path = state_path
+
+    def _load(self):
+        state = _read_private_json(self.state_path) if self.state_path else None
+        if not isinstance(state, dict):
+            return
+        tokens, ts = state.get("tokens"), state.get("ts")
+        if isinstance(tokens, (int, float)) and isinstance(ts, (int, float)):
+            self.tokens = min(self.capacity, max(0, tokens))
+            self.ts = ts
+
+    def acquire(self):
+        """Take one token, sleeping until one is available"""
+        while True:
+            with self.lock:
+                self._load()
+                now = time.time()
+                self.tokens = min(self.capacity, self.tokens + max(0, now - self.ts) * self.rate)
+                self.ts = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    if self.state_path:
+                        _write_private_json({"tokens": self.tokens, "ts": self.ts}, self.state_path)
+                    return
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
 
 class AutoConciergeAPITester:
+    __slots__ = (
+        "base_url", "urls", "admin_token", "dealer_token", "tests_run", "tests_passed",
+        "_test_names", "_successes", "_details", "_timestamps", "_lock", "_get_cache", "_login_bucket", "session"
+    )
+
+    # Constant request bodies, serialized once instead of on every call
+    _ADMIN_LOGIN_BODY = json.dumps({
+        "username": "admin@autoconcierge.com",
+        "password": "admin123"
+    }).encode()
+    _DEALER_LOGIN_BODY = json.dumps({
+        "dealerId": "DEALER-0001",
+        "passcode": "123456"
+    }).encode()
+    _RESET_REQUEST_BODY = json.dumps({
+        "email": "test@example.com"
+    }).encode()
+    _RESET_PASSCODE_BODY = json.dumps({
+        "token": "invalid_token",
+        "passcode": "newpass123"
+    }).encode()
+    _BULK_UPDATE_BODY = json.dumps({
+        "vehicleIds": ["VEH-TEST-001", "VEH-TEST-002"],
+        "status": "available"
+    }).encode()
+
+    # Admin JWTs are cached per base_url in _CACHE_DIR and reused for
+    # ADMIN_TOKEN_TTL seconds
+    _ADMIN_TOKEN_TTL = 25 * 60
+
+    # Route groups GET /api must advertise
+    _EXPECTED_ROUTES = frozenset({"/api/public", "/api/dealer", "/api/admin"})
+
+    # Every path the suite requests, resolved against base_url once in __init__
+    _ENDPOINTS = (
+        "/health",
+        "/api",
+        "/api/admin/login",
+        "/api/admin/dealers",
+        "/api/dealer/login",
+        "/api/dealer/request-reset",
+        "/api/dealer/reset-passcode",
+        "/api/public/qrcode/DEALER-0001",
+        "/api/admin/export/dealers",
+        "/api/admin/export/vehicles",
+        "/api/admin/export/requests",
+        "/api/admin/vehicles/bulk-update",
+        "/api/admin/check-alerts",
+        "/api/public/dealer/DEALER-0001",
+        "/api/public/dealer/DEALER-0001/vehicles",
+    )
+
     def __init__(self, base_url="http://localhost:8001"):
         self.base_url = base_url
+        self.urls = {path: f"{base_url}{path}" for path in self._ENDPOINTS}
         self.admin_token = None
         self.dealer_token = None
         self.tests_run = 0
         self.tests_passed = 0
-        self.results = []
+        # Results stored column-wise; rows are only built in get_results()
+        self._test_names = []
+        self._successes = []
+        self._details = []
+        self._timestamps = []
+        self._lock = threading.Lock()
+        # url -> (fetched_at, response) for idempotent GETs
+        self._get_cache = {}
+        # Admin and dealer login share the server's authRateLimiter
+        # (10 attempts per 15 minutes), so pace both through one bucket whose
+        # level persists per host across runs
+        self._login_bucket = _TokenBucket(
+            capacity=10,
+            refill_per_sec=10 / (15 * 60),
+            state_path=os.path.join(_CACHE_DIR, f"login_bucket-{_host_key(base_url)}.json")
+        )
 
-    def log_result(self, test_name, success, details=""):
-        """Log test result"""
-        self.tests_run += 1
-        if success:
-            self.tests_passed += 1
-            print(f"✅ {test_name} - PASSED")
-        else:
-            print(f"❌ {test_name} - FAILED: {details}")
+        # Reuse pooled keep-alive connections across every test. The suite
+        # talks to a single host, so one pool sized for the peak parallel
+        # fan-out keeps every concurrent probe on a warm connection.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=20,
+            max_retries=Retry(total=2, backoff_factor=0.1, status_forcelist=[502, 503, 504])
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Content-Type": "application/json"})
+
+    def close(self):
+        """Release pooled connections"""
+        self.session.close()
+
+    def _cached_get(self, url, ttl=5):
+        """GET an idempotent endpoint, reusing a response fetched within ttl seconds"""
+        with self._lock:
+            cached = self._get_cache.get(url)
+        if cached and time.monotonic() - cached[0] < ttl:
+            return cached[1]
+        
+        response = self.session.get(url, timeout=10)
+        with self._lock:
+            self._get_cache[url] = (time.monotonic(), response)
+        return response
+
+    def _fetch_headers(self, url, headers=None):
+        """Fetch only the status and headers of a GET endpoint, without its body"""
+        response = self.session.head(url, headers=headers, timeout=10, allow_redirects=True)
+        if response.status_code == 405:
+            # HEAD not supported: start a GET and drop the body unread
+            response = self.session.get(url, headers=headers, stream=True, timeout=10)
+            response.close()
+        return response
+
+    def _admin_token_cache_path(self):
+        """Cache file for this tester's base_url"""
+        return os.path.join(_CACHE_DIR, f"admin_token-{_host_key(self.base_url)}.json")
+
+    def _load_cached_admin_token(self):
+        """Return the cached admin token if it is fresh and the server still accepts it"""
+        cached = _read_private_json(self._admin_token_cache_path())
+        if not isinstance(cached, dict):
+            return None
+        token, expires_at = cached.get("token"), cached.get("exp")
+        # Never send a token issued by a different server
+        if cached.get("base_url") != self.base_url:
+            return None
+        if not isinstance(token, str) or not token:
+            return None
+        if not isinstance(expires_at, (int, float)) or expires_at <= time.time() + 60:
+            return None
         
-        self.results.append({
-            "test": test_name,
-            "success": success,
-            "details": details,
-            "timestamp": datetime.now().isoformat()
-        })
-
-    def test_health_endpoint(self):
-        """Test GET /health endpoint"""
         try:
-            response = requests.get(f"{self.base_url}/health", timeout=10)
+            response = self._fetch_headers(
+                self.urls["/api/admin/dealers"],
+                {"Authorization": f"Bearer {token}"}
+            )
+        except requests.RequestException:
+            return None
+        return token if response.status_code == 200 else None
+
+    def _store_admin_token(self, token):
+        """Persist the admin token (owner-only permissions) for later runs"""
+        _write_private_json(
+            {"base_url": self.base_url, "token": token, "exp": time.time() + self._ADMIN_TOKEN_TTL},
+            self._admin_token_cache_path()
+        )
+
+    @staticmethod
+    def _body_preview(response, limit=200):
+        """Decode only the head of a response body for failure details"""
+        return response.content[:limit].decode("utf-8", "replace")
+
+    def log_result(self, test_name, success, details=""):
+        """Log test result (safe to call from worker threads)"""
+        with self._lock:
+            # Record the result before writing, so a failed write can't
+            # leave the counters out of step with the result rows
+            self.tests_run += 1
+            if success:
+                self.tests_passed += 1
+            self._test_names.append(test_name)
+            self._successes.append(success)
+            self._details.append(details)
+            self._timestamps.append(time.time_ns())
             
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("ok") is True:
-                    self.log_result("Health endpoint", True, f"Status: {response.status_code}, Response: {data}")
-                    return True
-                else:
-                    self.log_result("Health endpoint", False, f"Invalid response format: {data}")
-                    return False
+            if success:
+                line = _PASS + test_name.encode() + b" - PASSED\n"
+            else:
+                line = _FAIL + f"{test_name} - FAILED: {details}\n".encode()
+            out = getattr(sys.stdout, "buffer", None)
+            if out is not None:
+                out.write(line)
+            else:
+                # Text-only stdout (redirect_stdout to StringIO, IDLE, Jupyter)
+                sys.stdout.write(line.decode())
+
+    def _suite(self):
+        """Declare the suite as (name, test, dependencies) nodes"""
+        return [
+            ("basic", self.test_basic_endpoints, []),
+            ("admin_login", self.test_admin_login_with_rate_limiting, []),
+            ("dealer_login", self.test_dealer_login_with_rate_limiting, []),
+            ("reset", self.test_passcode_reset_endpoints, []),
+            ("qr", self.test_qr_code_generation, []),
+            ("public", self.test_public_endpoints, []),
+            # Admin-only endpoints need the token set by admin_login
+            ("csv", self.test_csv_export_endpoints, ["admin_login"]),
+            ("bulk", self.test_bulk_update_vehicles, ["admin_login"]),
+            ("alerts", self.test_check_alerts, ["admin_login"]),
+        ]
+
+    def _run_suite(self, suite):
+        """Run each test as soon as its dependencies have finished"""
+        pending = {name: (test, set(deps)) for name, test, deps in suite}
+        done = set()
+        with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+            running = {}
+            while pending or running:
+                for name in [name for name, (_, deps) in pending.items() if deps <= done]:
+                    test, _ = pending.pop(name)
+                    running[executor.submit(test)] = name
+                if not running:
+                    raise ValueError(f"Unsatisfiable test dependencies: {sorted(pending)}")
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    done.add(running.pop(future))
+                    future.result()
+
+    def test_basic_endpoints(self):
+        """Test GET /health and GET /api, fetched together"""
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            health = executor.submit(self._cached_get, self.urls["/health"])
+            api_status = executor.submit(self._cached_get, self.urls["/api"])
+        
+        health_ok = self._check_health_endpoint(health)
+        api_status_ok = self._check_api_status_endpoint(api_status)
+        return health_ok and api_status_ok
+
+    @_safe_test("Health endpoint")
+    def _check_health_endpoint(self, pending):
+        """Check the GET /health response"""
+        response = pending.result()
+        
+        if response.status_code == 200:
+            data = parse_json(response)
+            if data.get("ok") is True:
+                self.log_result("Health endpoint", True, f"Status: {response.status_code}, Response: {data}")
+                return True
             else:
-                self.log_result("Health endpoint", False, f"Status: {response.status_code}")
+                self.log_result("Health endpoint", False, f"Invalid response format: {data}")
                 return False
-                
-        except Exception as e:
-            self.log_result("Health endpoint", False, f"Exception: {str(e)}")
+        else:
+            self.log_result("Health endpoint", False, f"Status: {response.status_code}")
             return False
 
-    def test_api_status_endpoint(self):
-        """Test GET /api endpoint"""
-        try:
-            response = requests.get(f"{self.base_url}/api", timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("ok") is True and "routes" in data:
-                    expected_routes = ["/api/public", "/api/dealer", "/api/admin"]
-                    routes = data.get("routes", [])
-                    if all(route in routes for route in expected_routes):
-                        self.log_result("API status endpoint", True, f"Routes: {routes}")
-                        return True
-                    else:
-                        self.log_result("API status endpoint", False, f"Missing expected routes. Got: {routes}")
-                        return False
+    @_safe_test("API status endpoint")
+    def _check_api_status_endpoint(self, pending):
+        """Check the GET /api response"""
+        response = pending.result()
+        
+        if response.status_code == 200:
+            data = parse_json(response)
+            if data.get("ok") is True and "routes" in data:
+                routes = data.get("routes", [])
+                # issubset() hashes every entry, so only apply it to a list of strings
+                well_formed = isinstance(routes, list) and all(isinstance(route, str) for route in routes)
+                if well_formed and self._EXPECTED_ROUTES.issubset(routes):
+                    self.log_result("API status endpoint", True, f"Routes: {routes}")
+                    return True
                 else:
-                    self.log_result("API status endpoint", False, f"Invalid response format: {data}")
+                    self.log_result("API status endpoint", False, f"Missing expected routes. Got: {routes}")
                     return False
             else:
-                self.log_result("API status endpoint", False, f"Status: {response.status_code}")
+                self.log_result("API status endpoint", False, f"Invalid response format: {data}")
                 return False
-                
-        except Exception as e:
-            self.log_result("API status endpoint", False, f"Exception: {str(e)}")
+        else:
+            self.log_result("API status endpoint", False, f"Status: {response.status_code}")
             return False
 
+    @_safe_test("Admin login with rate limiting")
     def test_admin_login_with_rate_limiting(self):
         """Test POST /api/admin/login with rate limiting"""
-        try:
-            login_data = {
-                "username": "admin@autoconcierge.com",
-                "password": "admin123"
-            }
-            
-            # First login attempt should succeed
-            response = requests.post(
-                f"{self.base_url}/api/admin/login",
-                json=login_data,
-                headers={"Content-Type": "application/json"},
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("ok") is True and "token" in data:
-                    self.admin_token = data["token"]
-                    self.log_result("Admin login with rate limiting", True, "Successfully authenticated")
-                    return True
-                else:
-                    self.log_result("Admin login with rate limiting", False, f"Invalid response format: {data}")
-                    return False
+        # Reuse a still-valid token from a previous run instead of logging in,
+        # unless AUTOCONCIERGE_FORCE_LOGIN asks for a real login. The reuse is
+        # reported under its own name so it never counts as a login pass.
+        if os.environ.get("AUTOCONCIERGE_FORCE_LOGIN", "0") in ("", "0"):
+            token = self._load_cached_admin_token()
+            if token:
+                self.admin_token = token
+                self.log_result(
+                    "Admin token reuse", True,
+                    "Reused cached admin token; login not exercised (set AUTOCONCIERGE_FORCE_LOGIN=1 to test it)"
+                )
+                return True
+        
+        # First login attempt should succeed
+        self._login_bucket.acquire()
+        response = self.session.post(
+            self.urls["/api/admin/login"],
+            data=self._ADMIN_LOGIN_BODY,
+            timeout=10
+        )
+        
+        if response.status_code == 200:
+            data = parse_json(response)
+            if data.get("ok") is True and (token := data.get("token")):
+                self.admin_token = token
+                self._store_admin_token(token)
+                self.log_result("Admin login with rate limiting", True, "Successfully authenticated")
+                return True
             else:
-                self.log_result("Admin login with rate limiting", False, f"Status: {response.status_code}, Response: {response.text}")
+                self.log_result("Admin login with rate limiting", False, f"Invalid response format: {data}")
                 return False
-                
-        except Exception as e:
-            self.log_result("Admin login with rate limiting", False, f"Exception: {str(e)}")
+        else:
+            self.log_result("Admin login with rate limiting", False, f"Status: {response.status_code}, Response: {self._body_preview(response)}")
             return False
 
+    @_safe_test("Dealer login with rate limiting")
     def test_dealer_login_with_rate_limiting(self):
         """Test POST /api/dealer/login with rate limiting"""
-        try:
-            # First, we need to create a dealer or use existing one
-            # For testing, we'll try with a common dealer ID
-            login_data = {
-                "dealerId": "DEALER-0001",
-                "passcode": "123456"
-            }
-            
-            response = requests.post(
-                f"{self.base_url}/api/dealer/login",
-                json=login_data,
-                headers={"Content-Type": "application/json"},
-                timeout=10
-            )
-            
-            # This might fail if dealer doesn't exist, which is acceptable for testing
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("ok") is True and "token" in data:
-                    self.dealer_token = data["token"]
-                    self.log_result("Dealer login with rate limiting", True, "Successfully authenticated")
-                    return True
-                else:
-                    self.log_result("Dealer login with rate limiting", False, f"Invalid response format: {data}")
-                    return False
-            elif response.status_code == 401:
-                # Expected if dealer doesn't exist or wrong passcode
-                self.log_result("Dealer login with rate limiting", True, "Expected 401 - dealer not found or wrong passcode")
+        # First, we need to create a dealer or use existing one
+        # For testing, we'll try with a common dealer ID
+        self._login_bucket.acquire()
+        response = self.session.post(
+            self.urls["/api/dealer/login"],
+            data=self._DEALER_LOGIN_BODY,
+            timeout=10
+        )
+        
+        # This might fail if dealer doesn't exist, which is acceptable for testing.
+        # Check that expected 401 first so its error body is never parsed.
+        if response.status_code == 401:
+            # Expected if dealer doesn't exist or wrong passcode
+            self.log_result("Dealer login with rate limiting", True, "Expected 401 - dealer not found or wrong passcode")
+            return True
+        elif response.status_code == 200:
+            data = parse_json(response)
+            if data.get("ok") is True and (token := data.get("token")):
+                self.dealer_token = token
+                self.log_result("Dealer login with rate limiting", True, "Successfully authenticated")
                 return True
             else:
-                self.log_result("Dealer login with rate limiting", False, f"Status: {response.status_code}, Response: {response.text}")
+                self.log_result("Dealer login with rate limiting", False, f"Invalid response format: {data}")
                 return False
-                
-        except Exception as e:
-            self.log_result("Dealer login with rate limiting", False, f"Exception: {str(e)}")
+        else:
+            self.log_result("Dealer login with rate limiting", False, f"Status: {response.status_code}, Response: {self._body_preview(response)}")
             return False
 
+    @_safe_test("Passcode reset endpoints")
     def test_passcode_reset_endpoints(self):
         """Test passcode reset endpoints"""
-        try:
-            # Test request reset
-            reset_data = {
-                "email": "test@example.com"
-            }
-            
-            response = requests.post(
-                f"{self.base_url}/api/dealer/request-reset",
-                json=reset_data,
-                headers={"Content-Type": "application/json"},
-                timeout=10
-            )
-            
-            # Should return success even if email doesn't exist (security)
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("ok") is True:
-                    self.log_result("Passcode reset request", True, "Reset request processed")
-                    
-                    # Test reset with token (will fail without valid token, but endpoint should exist)
-                    reset_passcode_data = {
-                        "token": "invalid_token",
-                        "passcode": "newpass123"
-                    }
-                    
-                    response2 = requests.post(
-                        f"{self.base_url}/api/dealer/reset-passcode",
-                        json=reset_passcode_data,
-                        headers={"Content-Type": "application/json"},
-                        timeout=10
-                    )
-                    
-                    # Should return 400 for invalid token
-                    if response2.status_code == 400:
-                        self.log_result("Passcode reset with token", True, "Expected 400 for invalid token")
-                        return True
-                    else:
-                        self.log_result("Passcode reset with token", False, f"Unexpected status: {response2.status_code}")
-                        return False
+        # Test request reset
+        response = self.session.post(
+            self.urls["/api/dealer/request-reset"],
+            data=self._RESET_REQUEST_BODY,
+            timeout=10
+        )
+        
+        # Should return success even if email doesn't exist (security)
+        if response.status_code == 200:
+            data = parse_json(response)
+            if data.get("ok") is True:
+                self.log_result("Passcode reset request", True, "Reset request processed")
+                
+                # Test reset with token (will fail without valid token, but endpoint should exist)
+                response2 = self.session.post(
+                    self.urls["/api/dealer/reset-passcode"],
+                    data=self._RESET_PASSCODE_BODY,
+                    timeout=10
+                )
+                
+                # Should return 400 for invalid token
+                if response2.status_code == 400:
+                    self.log_result("Passcode reset with token", True, "Expected 400 for invalid token")
+                    return True
                 else:
-                    self.log_result("Passcode reset request", False, f"Invalid response: {data}")
+                    self.log_result("Passcode reset with token", False, f"Unexpected status: {response2.status_code}")
                     return False
             else:
-                self.log_result("Passcode reset request", False, f"Status: {response.status_code}")
+                self.log_result("Passcode reset request", False, f"Invalid response: {data}")
                 return False
-                
-        except Exception as e:
-            self.log_result("Passcode reset endpoints", False, f"Exception: {str(e)}")
+        else:
+            self.log_result("Passcode reset request", False, f"Status: {response.status_code}")
             return False
 
+    @_safe_test("QR code generation")
     def test_qr_code_generation(self):
         """Test GET /api/public/qrcode/DEALER-0001"""
-        try:
-            response = requests.get(f"{self.base_url}/api/public/qrcode/DEALER-0001", timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("ok") is True and "qrCode" in data and "url" in data:
-                    self.log_result("QR code generation", True, f"QR code generated for storefront URL")
-                    return True
-                else:
-                    self.log_result("QR code generation", False, f"Invalid response format: {data}")
-                    return False
+        response = self.session.get(self.urls["/api/public/qrcode/DEALER-0001"], timeout=10)
+        
+        if response.status_code == 200:
+            data = parse_json(response)
+            if data.get("ok") is True and "qrCode" in data and "url" in data:
+                self.log_result("QR code generation", True, f"QR code generated for storefront URL")
+                return True
             else:
-                self.log_result("QR code generation", False, f"Status: {response.status_code}")
+                self.log_result("QR code generation", False, f"Invalid response format: {data}")
                 return False
-                
-        except Exception as e:
-            self.log_result("QR code generation", False, f"Exception: {str(e)}")
+        else:
+            self.log_result("QR code generation", False, f"Status: {response.status_code}")
             return False
 
     def test_csv_export_endpoints(self):
@@ -241,162 +547,157 @@ class AutoConciergeAPITester:
         ]
         
         headers = {
-            "Authorization": f"Bearer {self.admin_token}",
-            "Content-Type": "application/json"
+            "Authorization": f"Bearer {self.admin_token}"
         }
         
         all_passed = True
-        for endpoint in endpoints:
-            try:
-                response = requests.get(f"{self.base_url}{endpoint}", headers=headers, timeout=10)
-                
-                if response.status_code == 200:
-                    # Should return CSV content
-                    content_type = response.headers.get('content-type', '')
-                    if 'text/csv' in content_type or 'application/csv' in content_type:
-                        self.log_result(f"CSV export {endpoint}", True, "CSV export successful")
+        with ThreadPoolExecutor(max_workers=len(endpoints)) as executor:
+            futures = {
+                executor.submit(self._fetch_headers, self.urls[endpoint], headers): endpoint
+                for endpoint in endpoints
+            }
+            for future in as_completed(futures):
+                endpoint = futures[future]
+                try:
+                    response = future.result()
+                    
+                    if response.status_code == 200:
+                        # Should return CSV content
+                        content_type = response.headers.get('content-type', '')
+                        is_csv = 'text/csv' in content_type or 'application/csv' in content_type
+                        if is_csv:
+                            self.log_result(f"CSV export {endpoint}", True, "CSV export successful")
+                        else:
+                            self.log_result(f"CSV export {endpoint}", True, "Export endpoint working (content type may vary)")
                     else:
-                        self.log_result(f"CSV export {endpoint}", True, "Export endpoint working (content type may vary)")
-                else:
-                    self.log_result(f"CSV export {endpoint}", False, f"Status: {response.status_code}")
-                    all_passed = False
+                        self.log_result(f"CSV export {endpoint}", False, f"Status: {response.status_code}")
+                        all_passed = False
                     
-            except Exception as e:
-                self.log_result(f"CSV export {endpoint}", False, f"Exception: {str(e)}")
-                all_passed = False
+                except Exception as e:
+                    self.log_result(f"CSV export {endpoint}", False, f"Exception: {str(e)}")
+                    all_passed = False
         
         return all_passed
 
+    @_safe_test("Bulk update vehicles")
     def test_bulk_update_vehicles(self):
         """Test POST /api/admin/vehicles/bulk-update (requires admin auth)"""
         if not self.admin_token:
             self.log_result("Bulk update vehicles", False, "No admin token available")
             return False
             
-        try:
-            bulk_data = {
-                "vehicleIds": ["VEH-TEST-001", "VEH-TEST-002"],
-                "status": "available"
-            }
-            
-            headers = {
-                "Authorization": f"Bearer {self.admin_token}",
-                "Content-Type": "application/json"
-            }
-            
-            response = requests.post(
-                f"{self.base_url}/api/admin/vehicles/bulk-update",
-                json=bulk_data,
-                headers=headers,
-                timeout=10
-            )
-            
-            # Should work even if vehicles don't exist
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("ok") is True:
-                    self.log_result("Bulk update vehicles", True, f"Bulk update processed: {data}")
-                    return True
-                else:
-                    self.log_result("Bulk update vehicles", False, f"Invalid response: {data}")
-                    return False
+        headers = {
+            "Authorization": f"Bearer {self.admin_token}"
+        }
+        
+        response = self.session.post(
+            self.urls["/api/admin/vehicles/bulk-update"],
+            data=self._BULK_UPDATE_BODY,
+            headers=headers,
+            timeout=10
+        )
+        
+        # Should work even if vehicles don't exist
+        if response.status_code == 200:
+            data = parse_json(response)
+            if data.get("ok") is True:
+                self.log_result("Bulk update vehicles", True, f"Bulk update processed: {data}")
+                return True
             else:
-                self.log_result("Bulk update vehicles", False, f"Status: {response.status_code}")
+                self.log_result("Bulk update vehicles", False, f"Invalid response: {data}")
                 return False
-                
-        except Exception as e:
-            self.log_result("Bulk update vehicles", False, f"Exception: {str(e)}")
+        else:
+            self.log_result("Bulk update vehicles", False, f"Status: {response.status_code}")
             return False
 
+    @_safe_test("Check alerts")
     def test_check_alerts(self):
         """Test POST /api/admin/check-alerts (requires admin auth)"""
         if not self.admin_token:
             self.log_result("Check alerts", False, "No admin token available")
             return False
             
-        try:
-            headers = {
-                "Authorization": f"Bearer {self.admin_token}",
-                "Content-Type": "application/json"
-            }
-            
-            response = requests.post(
-                f"{self.base_url}/api/admin/check-alerts",
-                headers=headers,
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("ok") is True and "alertsSent" in data:
-                    self.log_result("Check alerts", True, f"Alerts checked: {data['alertsSent']} sent")
-                    return True
-                else:
-                    self.log_result("Check alerts", False, f"Invalid response: {data}")
-                    return False
+        headers = {
+            "Authorization": f"Bearer {self.admin_token}"
+        }
+        
+        response = self.session.post(
+            self.urls["/api/admin/check-alerts"],
+            headers=headers,
+            timeout=10
+        )
+        
+        if response.status_code == 200:
+            data = parse_json(response)
+            if data.get("ok") is True and "alertsSent" in data:
+                self.log_result("Check alerts", True, f"Alerts checked: {data['alertsSent']} sent")
+                return True
             else:
-                self.log_result("Check alerts", False, f"Status: {response.status_code}")
+                self.log_result("Check alerts", False, f"Invalid response: {data}")
                 return False
-                
-        except Exception as e:
-            self.log_result("Check alerts", False, f"Exception: {str(e)}")
+        else:
+            self.log_result("Check alerts", False, f"Status: {response.status_code}")
             return False
 
     def test_public_endpoints(self):
         """Test public endpoints that don't require auth"""
+        # Idempotent GETs, served from the response cache on re-runs
         endpoints_to_test = [
-            ("/api/public/dealer/DEALER-0001", "GET"),
-            ("/api/public/dealer/DEALER-0001/vehicles", "GET"),
+            "/api/public/dealer/DEALER-0001",
+            "/api/public/dealer/DEALER-0001/vehicles",
         ]
         
         all_passed = True
-        for endpoint, method in endpoints_to_test:
-            try:
-                if method == "GET":
-                    response = requests.get(f"{self.base_url}{endpoint}", timeout=10)
-                
-                # These might return 404 if no dealers exist, which is acceptable
-                if response.status_code in [200, 404]:
-                    self.log_result(f"Public endpoint {endpoint}", True, f"Status: {response.status_code}")
-                else:
-                    self.log_result(f"Public endpoint {endpoint}", False, f"Status: {response.status_code}")
-                    all_passed = False
+        with ThreadPoolExecutor(max_workers=len(endpoints_to_test)) as executor:
+            futures = {
+                executor.submit(self._cached_get, self.urls[endpoint]): endpoint
+                for endpoint in endpoints_to_test
+            }
+            for future in as_completed(futures):
+                endpoint = futures[future]
+                try:
+                    response = future.result()
                     
-            except Exception as e:
-                self.log_result(f"Public endpoint {endpoint}", False, f"Exception: {str(e)}")
-                all_passed = False
+                    # These might return 404 if no dealers exist, which is acceptable
+                    if response.status_code in [200, 404]:
+                        self.log_result(f"Public endpoint {endpoint}", True, f"Status: {response.status_code}")
+                    else:
+                        self.log_result(f"Public endpoint {endpoint}", False, f"Status: {response.status_code}")
+                        all_passed = False
+                    
+                except Exception as e:
+                    self.log_result(f"Public endpoint {endpoint}", False, f"Exception: {str(e)}")
+                    all_passed = False
         
         return all_passed
 
     def run_all_tests(self):
-        """Run all backend tests"""
+        """Run all backend tests and print the summary"""
+        self.run_tests()
+        return self.print_summary()
+
+    def run_tests(self):
+        """Run all backend tests without printing the summary"""
         print("🚀 Starting Auto Concierge Jamaica Backend API Tests")
         print(f"📍 Testing against: {self.base_url}")
         print("=" * 60)
+        # log_result writes straight to sys.stdout.buffer; flush the text
+        # layer first so the header stays ahead of the result lines
+        sys.stdout.flush()
         
-        # Test basic endpoints
-        self.test_health_endpoint()
-        self.test_api_status_endpoint()
-        
-        # Test authentication with rate limiting
-        self.test_admin_login_with_rate_limiting()
-        self.test_dealer_login_with_rate_limiting()
-        
-        # Test passcode reset functionality
-        self.test_passcode_reset_endpoints()
-        
-        # Test QR code generation
-        self.test_qr_code_generation()
-        
-        # Test admin-only endpoints (requires admin auth)
-        self.test_csv_export_endpoints()
-        self.test_bulk_update_vehicles()
-        self.test_check_alerts()
+        # Warm DNS and the first pooled connection before any probe runs. The
+        # response lands in the GET cache, so the health check reuses it.
+        try:
+            self._cached_get(self.urls["/health"])
+        except requests.RequestException:
+            pass
         
-        # Test public endpoints
-        self.test_public_endpoints()
+        self._run_suite(self._suite())
         
-        # Print summary
+        self.close()
+
+    def print_summary(self):
+        """Print the pass/fail summary and return the process exit code"""
         print("\n" + "=" * 60)
         print(f"📊 Test Summary: {self.tests_passed}/{self.tests_run} tests passed")
         
@@ -414,7 +715,17 @@ class AutoConciergeAPITester:
             "passed_tests": self.tests_passed,
             "failed_tests": self.tests_run - self.tests_passed,
             "success_rate": (self.tests_passed / self.tests_run * 100) if self.tests_run > 0 else 0,
-            "results": self.results
+            "results": [
+                {
+                    "test": test_name,
+                    "success": success,
+                    "details": details,
+                    "timestamp": datetime.fromtimestamp(timestamp_ns / 1e9, tz=timezone.utc).isoformat()
+                }
+                for test_name, success, details, timestamp_ns in zip(
+                    self._test_names, self._successes, self._details, self._timestamps
+                )
+            ]
         }
 
 def main():
@@ -423,12 +734,14 @@ def main():
     base_url = "http://localhost:8001"
     
     tester = AutoConciergeAPITester(base_url)
-    exit_code = tester.run_all_tests()
+    tester.run_tests()
     
-    # Save results for reporting
-    results = tester.get_results()
-    with open("/tmp/backend_test_results.json", "w") as f:
-        json.dump(results, f, indent=2)
+    # Save results for reporting while the summary prints; result() re-raises
+    # any write error here, so a failed save still aborts with a traceback
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        writer = executor.submit(write_json, tester.get_results(), "/tmp/backend_test_results.json")
+        exit_code = tester.print_summary()
+        writer.result()
     
     return exit_code
 